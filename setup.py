@@ -1,9 +1,13 @@
 
 from src.core.database import PostgresDatabase
 from dotenv import load_dotenv
+import asyncio
+import logging
 import os
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
     # Load environment variables from .env file
     load_dotenv()
     
@@ -15,6 +19,12 @@ def main():
         print("Database setup completed successfully!")
     else:
         print("Database setup failed!")
+        return
+
+    # Run the sample queries to check the imported data
+    results = asyncio.run(db.execute_sample_queries())
+    for name, value in results.items():
+        print(f"{name}: {value}")
 
 if __name__ == "__main__":
     main()
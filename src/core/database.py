@@ -1,17 +1,348 @@
+import io
 import os
+import logging
+import re
+import hashlib
+import functools
+import uuid
+import datetime
+import weakref
 import csv
+import time
+import threading
+import multiprocessing
+from collections import OrderedDict
+from decimal import Decimal
+from itertools import chain, count, islice
+from types import SimpleNamespace
 import psycopg2
-from psycopg2 import sql
+from psycopg2 import errorcodes, errors, extensions, sql
+from psycopg2.extras import execute_batch
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, Any
+
+
+logger = logging.getLogger(__name__)
+
+
+# Columns of the customers table populated from the CSV, in table order
+CUSTOMER_COLUMNS = (
+    "customer_index", "customer_id", "first_name", "last_name",
+    "company", "city", "country", "phone_1", "phone_2",
+    "email", "subscription_date", "website"
+)
+
+# Mapping of CSV header names to customers table columns
+CSV_HEADER_COLUMNS = {
+    "Index": "customer_index",
+    "Customer Id": "customer_id",
+    "First Name": "first_name",
+    "Last Name": "last_name",
+    "Company": "company",
+    "City": "city",
+    "Country": "country",
+    "Phone 1": "phone_1",
+    "Phone 2": "phone_2",
+    "Email": "email",
+    "Subscription Date": "subscription_date",
+    "Website": "website",
+}
+
+# Statements that PostgreSQL can PREPARE
+_PREPARABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|VALUES|WITH)\b", re.IGNORECASE)
+
+# psycopg2 placeholders and escapes; a bare % means a style that can't be rewritten
+_PLACEHOLDER = re.compile(r"%s|%%|%")
+
+# Server types a prepared parameter may have for each Python type to give the same
+# result as the query run unprepared. psycopg2 sends str as an untyped literal, which
+# the server types from context the same way it types a parameter, so any type goes
+_PARAM_TYPES = {
+    bool: {"boolean"},
+    int: {"smallint", "integer", "bigint", "numeric", "double precision"},
+    float: {"numeric", "double precision"},
+    Decimal: {"numeric"},
+    datetime.datetime: {"timestamp without time zone", "timestamp with time zone"},
+    datetime.date: {"date", "timestamp without time zone", "timestamp with time zone"},
+    datetime.time: {"time without time zone", "time with time zone"},
+    datetime.timedelta: {"interval"},
+    bytes: {"bytea"},
+    uuid.UUID: {"uuid"},
+}
+
+# Integer parameter types and the magnitude their values must stay below
+_INT_LIMITS = {"smallint": 2 ** 15, "integer": 2 ** 31, "bigint": 2 ** 63}
+
+# Errors raised when a query refers to objects that don't exist yet
+_UNDEFINED_OBJECT_ERRORS = {
+    errorcodes.UNDEFINED_TABLE,
+    errorcodes.UNDEFINED_COLUMN,
+    errorcodes.UNDEFINED_FUNCTION,
+    errorcodes.UNDEFINED_OBJECT,
+}
+
+
+def _params_match(types: Tuple[str, ...], params: Tuple) -> bool:
+    """
+    Check that parameters can run through a prepared statement unchanged.
+
+    The server converts every value to the parameter type inferred when the
+    statement was prepared, which would e.g. round 5.5 for an integer parameter
+    or drop the time of a datetime for a date parameter.
+
+    Args:
+        types: Parameter types of the prepared statement
+        params: Parameters of the current call
+
+    Returns:
+        True if every parameter keeps its value as the prepared type
+    """
+    for server_type, value in zip(types, params):
+        if value is None or isinstance(value, str):
+            continue
+        if server_type not in _PARAM_TYPES.get(type(value), ()):
+            return False
+        if type(value) is int and server_type in _INT_LIMITS and abs(value) >= _INT_LIMITS[server_type]:
+            return False
+    return True
+
+
+def _to_server_params(query: str) -> Optional[str]:
+    """
+    Rewrite psycopg2 %s placeholders as PostgreSQL $n parameters.
+
+    Args:
+        query: SQL query using %s placeholders
+
+    Returns:
+        Query using $1..$n parameters, or None if it uses other placeholder styles
+    """
+    position = count(1)
+
+    def replace(match):
+        token = match.group()
+        if token == "%s":
+            return f"${next(position)}"
+        if token == "%%":
+            return "%"
+        raise ValueError(f"Unsupported placeholder in query: {query}")
+
+    try:
+        return _PLACEHOLDER.sub(replace, query.strip().rstrip(";"))
+    except ValueError:
+        return None
+
+
+class _BatchCursor(extensions.cursor):
+    """
+    A cursor whose executemany sends parameter sets in pages.
+
+    psycopg2's executemany runs one statement per parameter set; this routes it
+    through execute_batch so every page costs a single server round-trip. Each page
+    runs as one multi-statement query, so afterwards rowcount holds the count of the
+    last statement only, not the total psycopg2 reports.
+    """
+
+    page_size = 500
+
+    def executemany(self, query, vars_list) -> None:
+        execute_batch(self, query, vars_list, page_size=self.page_size)
+
+
+class _CopyIter(io.RawIOBase):
+    """
+    A read-only file object over an iterator of byte chunks.
+
+    Lets COPY FROM STDIN consume lazily generated data, so rows never have
+    to be materialized in memory before being sent to the server.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def _csv_lines(rows: Iterable[Tuple]) -> Iterator[bytes]:
+    """
+    Encode rows as CSV lines, one row at a time.
+
+    Args:
+        rows: Rows to encode
+
+    Returns:
+        Iterator of UTF-8 encoded CSV lines
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _read_csv_columns(f) -> List[str]:
+    """
+    Read the header line of a CSV file and map it to customers table columns.
+
+    Args:
+        f: CSV file positioned at its header line
+
+    Returns:
+        Table column for each CSV column, in file order
+    """
+    header = next(csv.reader([f.readline()]))
+    return [CSV_HEADER_COLUMNS.get(name.strip(), name.strip()) for name in header]
+
+
+def _shard_lines(f, start: int, end: int) -> Iterator[bytes]:
+    """
+    Yield the lines of a binary file whose first byte lies in [start, end).
+
+    The shard starting at byte 0 skips the header line. Lines are split on
+    newlines, so quoted CSV fields must not contain line breaks.
+
+    Args:
+        f: File opened in binary mode
+        start: First byte offset of the shard
+        end: Byte offset where the shard ends
+
+    Returns:
+        Iterator of raw CSV lines
+    """
+    if start == 0:
+        f.seek(0)
+    else:
+        # Skip the line straddling the boundary, it belongs to the previous shard
+        f.seek(start - 1)
+    f.readline()
+
+    while f.tell() < end:
+        line = f.readline()
+        if not line:
+            break
+        yield line
+
+
+def _env_int(name: str, default: int) -> int:
+    """
+    Read an integer setting from the environment.
+
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is not set
+
+    Returns:
+        The integer value
+
+    Raises:
+        ValueError: If the variable is set to something that isn't an integer
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from None
+
+
+@functools.lru_cache(maxsize=None)
+def _env_config(env_file: str) -> SimpleNamespace:
+    """
+    Load database settings from a .env file and the environment, once per file.
+
+    Args:
+        env_file: Path to the .env file containing database credentials
+
+    Returns:
+        Namespace of database settings
+    """
+    # Load environment variables from .env file
+    load_dotenv(env_file)
+
+    return SimpleNamespace(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=_env_int("DB_PORT", 5433),
+        name=os.getenv("DB_NAME", "rag_to_sql"),
+        user=os.getenv("DB_USER", "postgres"),
+        password=os.getenv("DB_PASSWORD", "1234"),
+        import_batch_size=_env_int("DB_IMPORT_BATCH_SIZE", 1000),
+        prepared_cache_size=_env_int("DB_PREPARED_CACHE_SIZE", 128),
+    )
+
+
+def _copy_csv_shard(args: Tuple[Dict[str, Any], str, int, int]) -> int:
+    """
+    Copy one byte range of the customer CSV on a dedicated connection.
+
+    Runs in a worker process, so it connects directly instead of using the
+    pools inherited from the parent.
+
+    Args:
+        args: Connection parameters, CSV path, shard start and end offsets
+
+    Returns:
+        Number of rows copied
+    """
+    conn_params, csv_path, start, end = args
+
+    conn = psycopg2.connect(**conn_params)
+    try:
+        with conn, conn.cursor() as cursor:
+            cursor.execute("SET LOCAL synchronous_commit = off")
+            with open(csv_path, 'rb') as f:
+                cursor.copy_expert(
+                    f"COPY customers ({', '.join(CUSTOMER_COLUMNS)}) FROM STDIN WITH (FORMAT CSV)",
+                    _CopyIter(_shard_lines(f, start, end))
+                )
+            return cursor.rowcount
+    finally:
+        conn.close()
 
 
 class PostgresDatabase:
     """
     A class to handle PostgreSQL database operations including
     database creation, table creation, and data import.
+
+    Connections are borrowed from a process-wide pool per database and
+    returned on disconnect, so repeated connect/disconnect cycles reuse
+    the same server sessions.
     """
 
+    # Connection pools shared by all instances, keyed by connection target
+    _pools: Dict[Tuple, ThreadedConnectionPool] = {}
+
+    # Prepared statement names and parameter types per pooled connection, keyed by SQL
+    # text in LRU order.
+    # Kept per connection since prepared statements live as long as the server session
+    _prepared: "weakref.WeakKeyDictionary[Any, OrderedDict]" = weakref.WeakKeyDictionary()
+    _pools_lock = threading.Lock()
+    pool_minconn = 1
+    pool_maxconn = 8
+
+    # Rows fetched per round-trip when streaming query results
+    stream_itersize = 1000
+
     def __init__(self, env_file: str = '.env'):
         """
         Initialize the database connection parameters from environment variables.
@@ -19,19 +350,82 @@ class PostgresDatabase:
         Args:
             env_file: Path to the .env file containing database credentials
         """
-        # Load environment variables from .env file
-        load_dotenv(env_file)
+        # Settings are read and validated once per .env file, then shared by all instances
+        config = _env_config(env_file)
 
         # Database connection parameters from environment variables
-        self.host = os.getenv("DB_HOST", "localhost")
-        self.port = os.getenv("DB_PORT", "5433")
-        self.name = os.getenv("DB_NAME", "rag_to_sql")
-        self.user = os.getenv("DB_USER", "postgres")
-        self.password = os.getenv("DB_PASSWORD", "1234")
+        self.host = config.host
+        self.port = config.port
+        self.name = config.name
+        self.user = config.user
+        self.password = config.password
+
+        # Number of rows inserted and committed per batch when importing data
+        self.import_batch_size = config.import_batch_size
+
+        # Number of parameterized queries kept prepared per connection, 0 disables preparing
+        self.prepared_cache_size = config.prepared_cache_size
 
         # Connection objects
         self.conn = None
         self.cursor = None
+        self._pool = None
+
+    def _get_pool(self, database: str) -> ThreadedConnectionPool:
+        """
+        Get the connection pool for a database, creating it on first use.
+
+        Args:
+            database: Database name the pool connects to
+
+        Returns:
+            ThreadedConnectionPool for the database
+        """
+        key = (self.host, self.port, self.user, database)
+
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = ThreadedConnectionPool(
+                    self.pool_minconn,
+                    self.pool_maxconn,
+                    **self._connection_params(database)
+                )
+                self._pools[key] = pool
+            return pool
+
+    def _connection_params(self, database: str) -> Dict[str, Any]:
+        """
+        Build the libpq connection parameters for a database.
+
+        Args:
+            database: Database name to connect to
+
+        Returns:
+            Dict of keyword arguments for psycopg2.connect and psycopg.connect
+        """
+        return {
+            "host": self.host,
+            "port": self.port,
+            "user": self.user,
+            "password": self.password,
+            "dbname": database,
+            # Pooled connections sit idle between operations, let TCP keepalives
+            # detect dropped connections before they are handed out again
+            "keepalives": 1,
+            "keepalives_idle": 30,
+            "application_name": "rag_to_sql",
+            # Decode text as UTF-8 in both drivers whatever the server encoding
+            "client_encoding": "utf8",
+        }
+
+    @classmethod
+    def close_pools(cls) -> None:
+        """Close every pooled connection held by the class."""
+        with cls._pools_lock:
+            for pool in cls._pools.values():
+                pool.closeall()
+            cls._pools.clear()
 
     def connect(self, database: str = None) -> None:
         """
@@ -46,29 +440,53 @@ class PostgresDatabase:
         db_name = database if database else self.name
 
         try:
-            self.conn = psycopg2.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=db_name
-            )
-            self.cursor = self.conn.cursor()
+            self._pool = self._get_pool(db_name)
+            self.conn = self._pool.getconn()
+            self.cursor = self.conn.cursor(cursor_factory=_BatchCursor)
             return True
-        except Exception as e:
-            print(f"Error connecting to database: {e}")
+        except Exception:
+            logger.exception("Error connecting to database")
             return False
 
+    @classmethod
+    def from_conn(cls, conn, env_file: str = '.env') -> "PostgresDatabase":
+        """
+        Create an instance that runs queries on an existing connection.
+
+        The caller keeps ownership of the connection: disconnect() only drops the
+        instance's reference to it, without rolling back or closing it.
+
+        Args:
+            conn: Open psycopg2 connection
+            env_file: Path to the .env file containing database credentials
+
+        Returns:
+            PostgresDatabase bound to the connection
+        """
+        database = cls(env_file)
+        database.conn = conn
+        database.cursor = conn.cursor(cursor_factory=_BatchCursor)
+        return database
+
     def disconnect(self) -> None:
-        """Close the database connection and cursor."""
+        """Close the cursor and return the connection to its pool."""
         if self.cursor:
             self.cursor.close()
-        if self.conn:
-            self.conn.close()
+        if self.conn and self._pool:
+            try:
+                # Discard uncommitted work and reset the session before reuse
+                if not self.conn.closed:
+                    self.conn.rollback()
+                    self.conn.autocommit = False
+                self._pool.putconn(self.conn)
+            except psycopg2.Error:
+                self._pool.putconn(self.conn, close=True)
         self.cursor = None
         self.conn = None
+        self._pool = None
 
-    def execute_query(self, query: str, params: Tuple = None, commit: bool = False) -> Optional[List]:
+    def execute_query(self, query: str, params: Tuple = None, commit: bool = False,
+                      stream: bool = False) -> Optional[Union[List, Iterator[Tuple]]]:
         """
         Execute a SQL query.
 
@@ -76,27 +494,225 @@ class PostgresDatabase:
             query: SQL query to execute
             params: Parameters for the query
             commit: Whether to commit the transaction
+            stream: Whether to return a generator reading rows from a server-side cursor
+                instead of fetching the whole result at once
 
         Returns:
-            Query results if any
+            Query results if any, or a generator of rows when streaming
+
+        Raises:
+            Exception: If the query fails. The transaction is rolled back first so the
+                connection stays usable
         """
+        if stream:
+            return self._stream_query(query, params)
+
         try:
             if params:
-                self.cursor.execute(query, params)
+                # Only a failure that loses no earlier work of the transaction can be retried
+                retryable = (self.conn.autocommit or
+                             self.conn.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE)
+                prepared = self._prepared_query(query, params)
+                try:
+                    self.cursor.execute(*prepared)
+                except (errors.FeatureNotSupported, errors.InvalidSqlStatementName):
+                    # The cached statement no longer fits the schema ("cached plan must not
+                    # change result type"), or the server dropped it
+                    if prepared[0] is query:
+                        raise
+                    self._forget_prepared(query)
+                    if not retryable:
+                        raise
+                    self.cursor.execute(query, params)
             else:
                 self.cursor.execute(query)
 
             if commit:
                 self.conn.commit()
 
-            # Try to fetch results, return None if not a SELECT query
-            try:
-                return self.cursor.fetchall()
-            except psycopg2.ProgrammingError:
+            # Statements without a result set (DDL, DML without RETURNING) have no description
+            if self.cursor.description is None:
                 return None
+
+            return self.cursor.fetchall()
+        except Exception as e:
+            logger.error("Error executing query: %s", e)
+            self._rollback()
+            raise
+
+    def _stream_query(self, query: str, params: Tuple = None) -> Iterator[Tuple]:
+        """
+        Yield the rows of a query from a named server-side cursor.
+
+        Rows are fetched stream_itersize at a time, so the full result is never held
+        in memory. Errors surface while iterating, after the transaction has been rolled
+        back so the connection stays usable.
+
+        Args:
+            query: SQL query to execute
+            params: Parameters for the query
+
+        Returns:
+            Iterator of result rows
+        """
+        # Named cursors live inside a transaction, WITH HOLD keeps them open under autocommit
+        cursor = self.conn.cursor(name=f"stream_{uuid.uuid4().hex}", withhold=self.conn.autocommit)
+        cursor.itersize = self.stream_itersize
+
+        failed = False
+        try:
+            cursor.execute(query, params)
+            yield from cursor
+        except Exception as e:
+            failed = True
+            logger.error("Error executing query: %s", e)
+            raise
+        finally:
+            try:
+                cursor.close()
+            except psycopg2.Error:
+                # The failed statement may have taken the cursor with it
+                if not failed:
+                    raise
+            if failed:
+                self._rollback()
+
+    def _prepared_query(self, query: Any, params: Tuple) -> Tuple[Any, Tuple]:
+        """
+        Route a parameterized query through a server-side prepared statement.
+
+        The query is prepared on its first use on the current connection and run
+        with EXECUTE afterwards, so the server parses and plans it only once.
+        Queries that can't be prepared, or whose parameters don't match the types
+        the server inferred for the statement, are returned unchanged.
+
+        Args:
+            query: SQL query to execute
+            params: Parameters for the query
+
+        Returns:
+            Query and parameters to pass to cursor.execute
+        """
+        if not self.prepared_cache_size or not isinstance(query, str) or not _PREPARABLE.match(query):
+            return query, params
+
+        cache = self._prepared.setdefault(self.conn, OrderedDict())
+        if query in cache:
+            cache.move_to_end(query)
+            statement = cache[query]
+        else:
+            statement, cacheable = self._prepare(query)
+            if not cacheable:
+                return query, params
+            cache[query] = statement
+
+            while len(cache) > self.prepared_cache_size:
+                _, evicted = cache.popitem(last=False)
+                if evicted:
+                    self.cursor.execute(f"DEALLOCATE {evicted[0]}")
+
+        # Checked on every call, the same statement may see other parameter types later
+        if statement is None or not _params_match(statement[1], params):
+            return query, params
+
+        return f"EXECUTE {statement[0]} ({', '.join(['%s'] * len(params))})", params
+
+    def _prepare(self, query: str) -> Tuple[Optional[Tuple[str, Tuple[str, ...]]], bool]:
+        """
+        PREPARE a query on the current connection.
+
+        Args:
+            query: SQL query using %s placeholders
+
+        Returns:
+            Name and parameter types of the prepared statement, or None if the query
+            can't be prepared, and whether that outcome can be cached. Failures caused
+            by objects that don't exist yet, such as a table created later, are retried
+            on the next call
+        """
+        server_query = _to_server_params(query)
+        if server_query is None:
+            return None, True
+
+        name = f"stmt_{hashlib.sha1(query.encode('utf-8')).hexdigest()[:16]}"
+        lookup = f"SELECT parameter_types::text[] FROM pg_prepared_statements WHERE name = '{name}'"
+
+        # Keep a failed PREPARE from aborting the caller's transaction. The savepoint is
+        # sent on its own: the server parses a whole query string before running any of
+        # it, so a PREPARE with a syntax error would also skip a savepoint sent with it
+        savepoint = not self.conn.autocommit
+        if savepoint:
+            self.cursor.execute("SAVEPOINT prepare_stmt")
+
+        try:
+            self.cursor.execute(f"PREPARE {name} AS {server_query}; {lookup}")
+            types = self.cursor.fetchone()[0]
+        except psycopg2.Error as e:
+            if savepoint:
+                self.cursor.execute("ROLLBACK TO SAVEPOINT prepare_stmt")
+                self.cursor.execute("RELEASE SAVEPOINT prepare_stmt")
+
+            # Errors in the statement itself (e.g. "IN $1" rewritten from "IN %s") are
+            # permanent, anything else may succeed later
+            permanent = (e.pgcode or "").startswith("42") and e.pgcode not in _UNDEFINED_OBJECT_ERRORS
+            return None, permanent
+
+        if savepoint:
+            self.cursor.execute("RELEASE SAVEPOINT prepare_stmt")
+
+        return (name, tuple(types)), True
+
+    def _forget_prepared(self, query: str) -> None:
+        """
+        Roll back and drop the cached prepared statement of a query.
+
+        The next call prepares the query again.
+
+        Args:
+            query: SQL query the statement was prepared from
+        """
+        self._rollback()
+
+        statement = self._prepared.get(self.conn, {}).pop(query, None)
+        if statement:
+            try:
+                self.cursor.execute(f"DEALLOCATE {statement[0]}")
+            except psycopg2.Error:
+                # Already gone from the server
+                self._rollback()
+
+    def _rollback(self) -> None:
+        """Roll back the current transaction, ignoring a connection that is already gone."""
+        try:
+            if self.conn:
+                self.conn.rollback()
+        except psycopg2.Error:
+            pass
+
+    def execute_many_query(self, query: str, seq_params: Iterable[Tuple], commit: bool = False) -> None:
+        """
+        Execute a SQL statement once for every set of parameters, in batches.
+
+        The cursor's rowcount is not the total number of affected rows afterwards,
+        only that of the last statement; count rows with a query if needed.
+
+        Args:
+            query: SQL statement to execute
+            seq_params: Sequence of parameter tuples
+            commit: Whether to commit the transaction
+
+        Raises:
+            Exception: If the statement fails, after rolling back the transaction
+        """
+        try:
+            self.cursor.executemany(query, seq_params)
+
+            if commit:
+                self.conn.commit()
         except Exception as e:
-            print(f"Error executing query: {e}")
-            return None
+            logger.error("Error executing query: %s", e)
+            self._rollback()
+            raise
 
     def create_database(self) -> bool:
         """
@@ -128,14 +744,14 @@ class PostgresDatabase:
 
             self.disconnect()
             return True
-        except Exception as e:
-            print(f"Error creating database: {e}")
+        except Exception:
+            logger.exception("Error creating database")
             self.disconnect()
             return False
 
     def create_customer_table(self) -> bool:
         """
-        Create the customer table in the database.
+        Create the customer table and its indexes in the database.
 
         Returns:
             bool: True if successful, False otherwise
@@ -144,49 +760,170 @@ class PostgresDatabase:
             if not self.connect(self.name):
                 return False
 
-            self.conn.autocommit = True
+            self._create_customer_table_schema()
+            self._create_customer_indexes()
 
-            # Create customer table
-            self.execute_query("""
-            CREATE TABLE IF NOT EXISTS customers (
-                id SERIAL PRIMARY KEY,
-                customer_index INTEGER,
-                customer_id VARCHAR(16) UNIQUE,
-                first_name VARCHAR(50),
-                last_name VARCHAR(50),
-                company VARCHAR(100),
-                city VARCHAR(100),
-                country VARCHAR(100),
-                phone_1 VARCHAR(50),
-                phone_2 VARCHAR(50),
-                email VARCHAR(100),
-                subscription_date DATE,
-                website VARCHAR(255)
-            )
-            """)
-
-            # Create indexes for better query performance
-            self.execute_query("CREATE INDEX IF NOT EXISTS idx_customer_id ON customers(customer_id)")
-            self.execute_query("CREATE INDEX IF NOT EXISTS idx_customer_email ON customers(email)")
-            self.execute_query("CREATE INDEX IF NOT EXISTS idx_customer_name ON customers(last_name, first_name)")
-            self.execute_query("CREATE INDEX IF NOT EXISTS idx_subscription_date ON customers(subscription_date)")
-            self.execute_query("CREATE INDEX IF NOT EXISTS idx_country ON customers(country)")
-
-            print("Customer table created successfully!")
+            self.disconnect()
+            return True
+        except Exception:
+            logger.exception("Error creating customer table")
+            self.disconnect()
+            return False
+
+    def create_customer_table_schema(self) -> bool:
+        """
+        Create the customer table without its secondary indexes.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if not self.connect(self.name):
+                return False
+
+            self._create_customer_table_schema()
 
             self.disconnect()
             return True
-        except Exception as e:
-            print(f"Error creating customer table: {e}")
+        except Exception:
+            logger.exception("Error creating customer table")
             self.disconnect()
             return False
 
-    def import_customer_data(self, csv_path: str = 'data/customer.csv') -> bool:
+    def create_customer_indexes(self) -> bool:
+        """
+        Create the secondary indexes on the customer table.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if not self.connect(self.name):
+                return False
+
+            self._create_customer_indexes()
+
+            self.disconnect()
+            return True
+        except Exception:
+            logger.exception("Error creating customer indexes")
+            self.disconnect()
+            return False
+
+    def _create_customer_table_schema(self, unlogged: bool = False) -> None:
+        """
+        Create the customer table on the open connection.
+
+        Args:
+            unlogged: Create the table UNLOGGED so a bulk import that follows skips
+                writing WAL. Every import switches the table to LOGGED, including one
+                that finds the data already loaded. Until then its contents are not
+                crash-safe: an unlogged table is truncated during crash recovery, which
+                the import's empty-table check treats as not yet imported
+        """
+        self.execute_query(f"""
+        CREATE {'UNLOGGED ' if unlogged else ''}TABLE IF NOT EXISTS customers (
+            id SERIAL PRIMARY KEY,
+            customer_index INTEGER,
+            customer_id VARCHAR(16) UNIQUE,
+            first_name VARCHAR(50),
+            last_name VARCHAR(50),
+            company VARCHAR(100),
+            city VARCHAR(100),
+            country VARCHAR(100),
+            phone_1 VARCHAR(50),
+            phone_2 VARCHAR(50),
+            email VARCHAR(100),
+            subscription_date DATE,
+            website VARCHAR(255)
+        )
+        """)
+
+        self.conn.commit()
+        print("Customer table created successfully!")
+
+    def _create_customer_indexes(self) -> None:
+        """
+        Create the secondary indexes on the open connection.
+
+        Run after bulk loads: building an index over existing rows is a single
+        sort, much cheaper than maintaining it for every inserted row.
+        """
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_customer_id ON customers(customer_id)")
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_customer_email ON customers(email)")
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_customer_name ON customers(last_name, first_name)")
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_subscription_date ON customers(subscription_date)")
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_country ON customers(country)")
+
+        # Lets year lookups and groupings written as EXTRACT(YEAR FROM subscription_date)::int use an index
+        self.execute_query(
+            "CREATE INDEX IF NOT EXISTS idx_cust_sub_year ON customers ((EXTRACT(YEAR FROM subscription_date)::int))"
+        )
+        self.conn.commit()
+
+        # Trigram index for leading-wildcard LIKE searches on email (e.g. '%leonard.com').
+        # pg_trgm is a contrib extension, so skip the index where it can't be installed
+        try:
+            self.cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_email_trgm ON customers USING gin (email gin_trgm_ops)")
+            self.conn.commit()
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            logger.warning("Skipping trigram email index: %s", e)
+
+        # Collect statistics for the freshly loaded rows and the expression index
+        self.execute_query("ANALYZE customers")
+
+        self.conn.commit()
+        print("Customer indexes created successfully!")
+
+    def _has_customer_data(self) -> bool:
+        """Check on the open connection whether the customer table has any rows."""
+        # Stops at the first row instead of counting the whole table
+        result = self.execute_query("SELECT 1 FROM customers LIMIT 1")
+        return bool(result)
+
+    def _estimated_customer_count(self) -> Optional[int]:
+        """
+        Estimate the number of customers from the planner statistics.
+
+        Returns:
+            Estimated row count, or None if the table has not been analyzed yet.
+            Only called on a table known to have rows, so an estimate of 0 counts as unknown
+        """
+        result = self.execute_query("SELECT reltuples::bigint FROM pg_class WHERE oid = 'customers'::regclass")
+        estimate = result[0][0] if result else -1
+        # Never-analyzed tables report -1 (PostgreSQL 14+) or 0 (earlier versions)
+        return estimate if estimate > 0 else None
+
+    def _set_customers_logged(self) -> None:
+        """
+        Make the customer table crash-safe once its data is loaded.
+
+        Also runs when an import is skipped, so a table left UNLOGGED by an interrupted
+        earlier run is switched over. SET LOGGED takes an ACCESS EXCLUSIVE lock even on a
+        table that is already logged, so it only runs on an unlogged one.
+        """
+        result = self.execute_query("SELECT relpersistence FROM pg_class WHERE oid = 'customers'::regclass")
+        if result and result[0][0] == "u":
+            self.execute_query("ALTER TABLE customers SET LOGGED", commit=True)
+
+    def _print_skipped_import(self) -> None:
+        """Report that the import is skipped because the table already has data."""
+        estimate = self._estimated_customer_count()
+        if estimate is None:
+            print("Customer table already contains records. Skipping import.")
+        else:
+            print(f"Customer table already contains about {estimate} records. Skipping import.")
+
+    def import_customer_data(self, csv_path: str = 'data/customer.csv', batch_size: int = None) -> bool:
         """
         Import data from CSV file into the customer table.
 
         Args:
             csv_path: Path to the CSV file
+            batch_size: Rows copied and committed per batch when the CSV columns need
+                reordering. If None, uses DB_IMPORT_BATCH_SIZE
 
         Returns:
             bool: True if successful, False otherwise
@@ -195,50 +932,152 @@ class PostgresDatabase:
             if not self.connect(self.name):
                 return False
 
-            # Check if data already exists
-            result = self.execute_query("SELECT COUNT(*) FROM customers")
-            count = result[0][0] if result else 0
+            self._import_customer_data(csv_path, batch_size)
 
-            if count > 0:
-                print(f"Customer table already contains {count} records. Skipping import.")
-                self.disconnect()
-                return True
+            self.disconnect()
+            return True
+        except Exception:
+            logger.exception("Error importing customer data")
+            self.disconnect()
+            return False
 
-            # Read CSV file and insert data
-            with open(csv_path, 'r') as f:
-                reader = csv.reader(f)
-                next(reader)  # Skip header row
-
-                for row in reader:
-                    self.execute_query(
-                        """
-                        INSERT INTO customers (
-                            customer_index, customer_id, first_name, last_name,
-                            company, city, country, phone_1, phone_2,
-                            email, subscription_date, website
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            row[0], row[1], row[2], row[3], row[4],
-                            row[5], row[6], row[7], row[8], row[9],
-                            row[10], row[11]
-                        )
+    def _import_customer_data(self, csv_path: str, batch_size: int = None) -> None:
+        """
+        Import data from CSV file into the customer table on the open connection.
+
+        Args:
+            csv_path: Path to the CSV file
+            batch_size: Rows copied and committed per batch. If None, uses DB_IMPORT_BATCH_SIZE
+        """
+        batch_size = batch_size if batch_size else self.import_batch_size
+
+        # Check if data already exists
+        if self._has_customer_data():
+            self._print_skipped_import()
+            self._set_customers_logged()
+            return
+
+        start = time.perf_counter()
+        column_list = ", ".join(CUSTOMER_COLUMNS)
+
+        # Don't wait for the WAL flush on each commit. A crash may lose the most recent
+        # batches, but never leaves the table inconsistent. Set for the session since
+        # batches commit, and reset before the pooled connection is reused
+        self.cursor.execute("SET synchronous_commit = off")
+        try:
+            with open(csv_path, 'r', newline='') as f:
+                columns = _read_csv_columns(f)
+
+                if tuple(columns) == CUSTOMER_COLUMNS:
+                    # Stream the whole file to the server in a single COPY
+                    f.seek(0)
+                    self.cursor.copy_expert(
+                        f"COPY customers ({column_list}) FROM STDIN WITH (FORMAT CSV, HEADER TRUE)",
+                        f
                     )
+                else:
+                    # Column order differs from the table, reorder rows before inserting
+                    missing = [column for column in CUSTOMER_COLUMNS if column not in columns]
+                    if missing:
+                        raise ValueError(f"CSV file is missing columns: {', '.join(missing)}")
+
+                    positions = [columns.index(column) for column in CUSTOMER_COLUMNS]
+                    reader = csv.reader(f)
+
+                    # Stream reordered rows through COPY, committing one batch at a time
+                    for first in reader:
+                        batch = chain([first], islice(reader, batch_size - 1))
+                        rows = (tuple(row[i] for i in positions) for row in batch)
+                        self.cursor.copy_expert(
+                            f"COPY customers ({column_list}) FROM STDIN WITH (FORMAT CSV)",
+                            _CopyIter(_csv_lines(rows))
+                        )
+                        self.conn.commit()
 
             self.conn.commit()
-            print("Customer data imported successfully!")
+        except Exception:
+            # Batches commit on their own, so a failure can leave part of the file behind.
+            # The table was empty before the import, so empty it again for a later run to retry
+            self.conn.rollback()
+            self.cursor.execute("TRUNCATE customers")
+            self.conn.commit()
+            raise
+        finally:
+            self.cursor.execute("RESET synchronous_commit")
+            self.conn.commit()
+
+        self._set_customers_logged()
+        print(f"Customer data imported successfully in {time.perf_counter() - start:.2f}s!")
+
+    def import_customer_data_parallel(self, csv_path: str = 'data/customer.csv', workers: int = 4) -> bool:
+        """
+        Import data from CSV file using several worker processes, each copying a shard.
+
+        The file is split into byte ranges aligned to line boundaries and every worker
+        COPYs its range over its own connection. CSV files whose columns need reordering,
+        or single-worker imports, fall back to import_customer_data. If any worker fails
+        the table is truncated so a later run starts from an empty table again.
+
+        Args:
+            csv_path: Path to the CSV file
+            workers: Number of worker processes and connections
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            with open(csv_path, 'r', newline='') as f:
+                columns = _read_csv_columns(f)
+
+            if workers < 2 or tuple(columns) != CUSTOMER_COLUMNS:
+                return self.import_customer_data(csv_path)
+
+            if not self.connect(self.name):
+                return False
+
+            # Check if data already exists
+            if self._has_customer_data():
+                self._print_skipped_import()
+                self._set_customers_logged()
+                self.disconnect()
+                return True
+
+            start = time.perf_counter()
+            size = os.path.getsize(csv_path)
+            bounds = [size * i // workers for i in range(workers + 1)]
+            shards = [
+                (self._connection_params(self.name), csv_path, bounds[i], bounds[i + 1])
+                for i in range(workers)
+            ]
+
+            try:
+                with multiprocessing.Pool(workers) as pool:
+                    rows = sum(pool.map(_copy_csv_shard, shards))
+            except Exception:
+                self.execute_query("TRUNCATE customers", commit=True)
+                raise
+
+            self._set_customers_logged()
+            print(f"Customer data imported successfully ({rows} rows, {workers} workers) "
+                  f"in {time.perf_counter() - start:.2f}s!")
 
             self.disconnect()
             return True
-        except Exception as e:
-            print(f"Error importing customer data: {e}")
+        except Exception:
+            logger.exception("Error importing customer data")
             self.disconnect()
             return False
 
-    def setup(self) -> bool:
+    def setup(self, csv_path: str = 'data/customer.csv') -> bool:
         """
         Set up the database, create tables, and import data.
 
+        Table creation, data import and index creation share a single connection.
+        Indexes are built after the import so rows are loaded into a bare table.
+
+        Args:
+            csv_path: Path to the CSV file to import
+
         Returns:
             bool: True if all operations were successful, False otherwise
         """
@@ -246,70 +1085,89 @@ class PostgresDatabase:
             if not self.create_database():
                 return False
 
-            if not self.create_customer_table():
+            if not self.connect(self.name):
                 return False
 
-            if not self.import_customer_data():
-                return False
+            self._create_customer_table_schema(unlogged=True)
+            self._import_customer_data(csv_path)
+            self._create_customer_indexes()
 
+            self.disconnect()
             print("Database setup completed successfully!")
             return True
-        except Exception as e:
-            print(f"Error during database setup: {e}")
+        except Exception:
+            logger.exception("Error during database setup")
+            self.disconnect()
             return False
 
-    def execute_sample_queries(self) -> Dict[str, Any]:
+    async def execute_sample_queries(self) -> Dict[str, Any]:
         """
         Run some sample queries to test the database.
 
+        The queries are independent, so they are sent together in psycopg 3
+        pipeline mode and share one round-trip instead of waiting on each other.
+
         Returns:
             Dict containing query results
         """
+        # Only this method needs psycopg 3, so the rest of the module doesn't pay for it
+        import psycopg
+
         results = {}
 
         try:
-            if not self.connect(self.name):
-                return {"error": "Failed to connect to database"}
-
-            # Query 1: Count total number of customers
-            count_result = self.execute_query("SELECT COUNT(*) FROM customers")
-            results["total_customers"] = count_result[0][0] if count_result else 0
-
-            # Query 2: Get customers by country (top 5 countries)
-            country_result = self.execute_query("""
-            SELECT country, COUNT(*) as customer_count
-            FROM customers
-            GROUP BY country
-            ORDER BY customer_count DESC
-            LIMIT 5
-            """)
-            results["top_countries"] = country_result if country_result else []
-
-            # Query 3: Get customers by subscription year
-            year_result = self.execute_query("""
-            SELECT EXTRACT(YEAR FROM subscription_date) as year, COUNT(*)
-            FROM customers
-            GROUP BY year
-            ORDER BY year
-            """)
-            results["customers_by_year"] = year_result if year_result else []
-
-            # Query 4: Get 5 random customers
-            customer_result = self.execute_query("""
-            SELECT customer_id, first_name, last_name, email, country
-            FROM customers
-            ORDER BY RANDOM()
-            LIMIT 5
-            """)
-            results["random_customers"] = customer_result if customer_result else []
+            # A dedicated connection rather than a pool: the method runs once per setup
+            # under asyncio.run, and an async pool is bound to the event loop that run
+            # discards, so nothing could be reused across calls anyway
+            conn = await psycopg.AsyncConnection.connect(**self._connection_params(self.name))
+            async with conn:
+                async with conn.pipeline():
+                    # Query 1: Count total number of customers
+                    count_cursor = await conn.execute("SELECT COUNT(*) FROM customers")
+
+                    # Query 2: Get customers by country (top 5 countries)
+                    country_cursor = await conn.execute("""
+                    SELECT country, COUNT(*) as customer_count
+                    FROM customers
+                    GROUP BY country
+                    ORDER BY customer_count DESC
+                    LIMIT 5
+                    """)
+
+                    # Query 3: Get customers by subscription year
+                    year_cursor = await conn.execute("""
+                    SELECT EXTRACT(YEAR FROM subscription_date)::int as year, COUNT(*)
+                    FROM customers
+                    GROUP BY year
+                    ORDER BY year
+                    """)
+
+                    # Query 4: Get 5 random customers. Sample about 20 rows with TABLESAMPLE,
+                    # sized from the planner's row estimate, and shuffle only those instead
+                    # of sorting the whole table randomly
+                    customer_cursor = await conn.execute("""
+                    SELECT customer_id, first_name, last_name, email, country
+                    FROM customers TABLESAMPLE BERNOULLI ((
+                        SELECT LEAST(100, 100 * 20 / GREATEST(reltuples, 1))
+                        FROM pg_class
+                        WHERE oid = 'customers'::regclass
+                    ))
+                    ORDER BY RANDOM()
+                    LIMIT 5
+                    """)
+
+                count_result = await count_cursor.fetchall()
+                results["total_customers"] = count_result[0][0] if count_result else 0
+                results["top_countries"] = await country_cursor.fetchall()
+                results["customers_by_year"] = await year_cursor.fetchall()
+                results["random_customers"] = await customer_cursor.fetchall()
 
-            self.disconnect()
             return results
         except Exception as e:
-            print(f"Error executing sample queries: {e}")
-            self.disconnect()
+            logger.exception("Error executing sample queries")
             return {"error": str(e)}
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     db = PostgresDatabase()
     db.setup()
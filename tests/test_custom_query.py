@@ -1,15 +1,40 @@
 import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import ThreadedConnectionPool
 from src.core.database import PostgresDatabase
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 
-@pytest.fixture(scope="module")
-def db():
-    """Fixture to create and manage database connection"""
+@pytest.fixture(scope="session")
+def pool():
+    """Fixture to create a connection pool shared by the whole test session"""
     database = PostgresDatabase()
-    if not database.connect():
-        pytest.fail("Failed to connect to database")
-    yield database
-    database.disconnect()
+    try:
+        pool = ThreadedConnectionPool(1, 1, **database._connection_params(database.name))
+    except Exception as e:
+        pytest.fail(f"Failed to connect to database: {e}")
+    yield pool
+    pool.closeall()
+
+@pytest.fixture(scope="session")
+def connection(pool):
+    """Fixture to hold one connection, and its open transaction, for the session"""
+    conn = pool.getconn()
+    yield conn
+    conn.rollback()
+    pool.putconn(conn)
+
+@pytest.fixture
+def db(connection):
+    """Fixture to run each test inside a savepoint that is rolled back afterwards"""
+    cursor = connection.cursor()
+    cursor.execute("SAVEPOINT test")
+    yield PostgresDatabase.from_conn(connection)
+    # A failed query already rolled back the whole transaction, savepoint included
+    if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+        cursor.execute("ROLLBACK TO SAVEPOINT test")
+        cursor.execute("RELEASE SAVEPOINT test")
+    cursor.close()
 
 class TestCustomQueries:
     def test_customers_by_country(self, db):
@@ -26,7 +51,7 @@ class TestCustomQueries:
         """Test querying customers who subscribed in a specific year"""
         year = 2021
         results = db.execute_query(
-            "SELECT customer_id, first_name, last_name, subscription_date FROM customers WHERE EXTRACT(YEAR FROM subscription_date) = %s",
+            "SELECT customer_id, first_name, last_name, subscription_date FROM customers WHERE EXTRACT(YEAR FROM subscription_date)::int = %s",
             (year,)
         )
         
@@ -58,14 +83,6 @@ class TestCustomQueries:
         
         assert len(results) == 1
 
-    def test_database_connection(self, db):
-        """Test database connection and disconnection"""
-        assert db.conn is not None
-        db.disconnect()
-        assert db.conn is None
-        assert db.connect()
-        assert db.conn is not None
-
     @pytest.mark.parametrize("invalid_country", ["InvalidCountry", "", None])
     def test_no_customers_for_invalid_country(self, db, invalid_country):
         """Test querying customers from a non-existent country"""
@@ -74,3 +91,141 @@ class TestCustomQueries:
             (invalid_country,)
         )
         assert len(results) == 0
+
+    def test_failed_stream_rolls_back(self, db):
+        """Test that a streamed query failing mid-iteration leaves the connection usable"""
+        rows = db.execute_query(
+            "SELECT 1 / (customer_index - 500) FROM customers ORDER BY customer_index",
+            stream=True
+        )
+
+        with pytest.raises(Exception):
+            list(rows)
+        assert db.conn.info.transaction_status == TRANSACTION_STATUS_IDLE
+
+    def test_execute_many_query(self, db):
+        """Test inserting rows in batches spanning several pages"""
+        db.execute_query("CREATE TEMP TABLE many_rows (id INTEGER, name TEXT)")
+        rows = [(i, f"name {i}") for i in range(1234)]
+
+        db.execute_many_query("INSERT INTO many_rows (id, name) VALUES (%s, %s)", rows)
+
+        assert db.execute_query("SELECT id, name FROM many_rows ORDER BY id") == rows
+
+
+class TestPreparedStatements:
+    @staticmethod
+    def prepared(db, marker):
+        """Names of server-side prepared statements whose text contains marker"""
+        with db.conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM pg_prepared_statements WHERE statement LIKE %s",
+                (f"%{marker}%",)
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_cache_hit(self, db):
+        """Test that repeating a query reuses one prepared statement"""
+        query = "SELECT COUNT(*) AS cache_hit FROM customers WHERE country = %s"
+
+        first = db.execute_query(query, ("China",))
+        second = db.execute_query(query, ("China",))
+
+        assert first == second == [(9,)]
+        assert len(self.prepared(db, "cache_hit")) == 1
+
+    def test_lru_eviction(self, db):
+        """Test that the least recently used statement is deallocated when the cache is full"""
+        db.prepared_cache_size = 2
+        queries = [
+            f"SELECT COUNT(*) AS lru_{i} FROM customers WHERE country = %s" for i in range(3)
+        ]
+
+        for query in queries:
+            db.execute_query(query, ("China",))
+
+        assert self.prepared(db, "lru_0") == []
+        assert len(self.prepared(db, "lru_1")) == 1
+        assert len(self.prepared(db, "lru_2")) == 1
+        assert db.execute_query(queries[0], ("China",)) == [(9,)]
+
+    def test_untyped_param_keeps_type(self, db):
+        """Test that parameters the server types as text keep their Python type"""
+        first = db.execute_query("SELECT COALESCE(%s, NULL) AS untyped_param", (None,))
+        second = db.execute_query("SELECT COALESCE(%s, NULL) AS untyped_param", (5,))
+
+        assert first == [(None,)]
+        assert second == [(5,)]
+
+    @pytest.mark.parametrize("query, params", [
+        ("SELECT COUNT(*) FROM customers WHERE customer_index = %s", (5.5,)),
+        ("SELECT COUNT(*) FROM customers WHERE customer_index = %s", (Decimal("7.6"),)),
+        ("SELECT COUNT(*) FROM customers WHERE customer_index = %s", (10 ** 12,)),
+        ("SELECT COUNT(*) FROM customers WHERE subscription_date >= %s", (datetime(2020, 1, 1, 12),)),
+    ])
+    def test_param_type_mismatch(self, db, query, params):
+        """Test that values the prepared parameter type would convert give unprepared results"""
+        db.prepared_cache_size = 0
+        expected = db.execute_query(query, params)
+        db.prepared_cache_size = 128
+
+        # Prepare the statement with a value matching its type, then reuse it
+        db.execute_query(query, (1,) if "customer_index" in query else (date(2020, 1, 1),))
+
+        assert db.execute_query(query, params) == expected
+
+    def test_in_tuple(self, db):
+        """Test that IN %s, which can't be prepared, runs and leaves the transaction usable"""
+        results = db.execute_query(
+            "SELECT COUNT(*) AS in_tuple FROM customers WHERE country IN %s",
+            (("China", "Peru"),)
+        )
+
+        assert results == [(10,)]
+        assert self.prepared(db, "in_tuple") == []
+        assert db.execute_query(
+            "SELECT COUNT(*) FROM customers WHERE country = %s", ("China",)
+        ) == [(9,)]
+
+    def test_missing_table_retried(self, db):
+        """Test that a query on a table that doesn't exist yet is prepared once it does"""
+        query = "SELECT COUNT(*) AS missing_table FROM later_table WHERE id = %s"
+        assert db._prepared_query(query, (1,)) == (query, (1,))
+        assert self.prepared(db, "missing_table") == []
+
+        db.execute_query("CREATE TABLE later_table (id INTEGER)")
+
+        assert db.execute_query(query, (1,)) == [(0,)]
+        assert len(self.prepared(db, "missing_table")) == 1
+
+    def test_changed_table_retried(self):
+        """Test that a statement invalidated by a schema change is dropped and the query retried"""
+        database = PostgresDatabase()
+        database.connect()
+        try:
+            database.execute_query("CREATE TEMP TABLE changed_table (id INTEGER)", commit=True)
+            query = "SELECT * FROM changed_table WHERE id = %s"
+            database.execute_query(query, (1,), commit=True)
+            assert len(self.prepared(database, "changed_table")) == 1
+
+            database.execute_query("ALTER TABLE changed_table ADD COLUMN b INTEGER", commit=True)
+
+            assert database.execute_query(query, (1,), commit=True) == []
+            assert self.prepared(database, "changed_table") == []
+            assert database.execute_query(query, (1,), commit=True) == []
+        finally:
+            database.execute_query("DROP TABLE IF EXISTS changed_table", commit=True)
+            database.disconnect()
+
+
+class TestConnection:
+    def test_database_connection(self):
+        """Test database connection and disconnection"""
+        database = PostgresDatabase()
+        assert database.connect()
+        assert database.conn is not None
+        database.disconnect()
+        assert database.conn is None
+        assert database.connect()
+        assert database.conn is not None
+        database.disconnect()
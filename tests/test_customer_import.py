@@ -0,0 +1,126 @@
+import csv
+import psycopg2
+import pytest
+from psycopg2 import sql
+from src.core.database import PostgresDatabase, CUSTOMER_COLUMNS, CSV_HEADER_COLUMNS
+
+CUSTOMER_CSV = "data/customer.csv"
+
+# Customer columns as text, with NULL read back as the empty field COPY loaded it from
+SELECT_ROWS = (
+    "SELECT " + ", ".join(f"COALESCE({column}::text, '')" for column in CUSTOMER_COLUMNS) +
+    " FROM customers ORDER BY customer_index"
+)
+
+
+def read_rows(path):
+    """Read the rows of a customer CSV in customers table column order"""
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        return [tuple(row[header] for header in CSV_HEADER_COLUMNS) for row in reader]
+
+
+def write_csv(path, headers, rows):
+    """Write customer rows under the given headers, in that column order"""
+    positions = [list(CSV_HEADER_COLUMNS).index(header) for header in headers]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows([row[i] for i in positions] for row in rows)
+
+
+@pytest.fixture(scope="module")
+def scratch():
+    """Fixture to create a scratch database, since imports commit as they go"""
+    database = PostgresDatabase()
+    database.name = f"{database.name}_import_test"
+    assert database.create_database()
+    yield database
+
+    PostgresDatabase.close_pools()
+    conn = psycopg2.connect(**database._connection_params("postgres"))
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(database.name)))
+    conn.close()
+
+
+@pytest.fixture
+def importer(scratch):
+    """Fixture to give each test an empty customer table in the scratch database"""
+    assert scratch.create_customer_table_schema()
+    yield scratch
+    scratch.connect()
+    scratch.execute_query("DROP TABLE IF EXISTS customers", commit=True)
+    scratch.disconnect()
+
+
+def query(database, statement):
+    """Run a query on a connection of its own and return the rows"""
+    database.connect()
+    try:
+        return database.execute_query(statement)
+    finally:
+        database.disconnect()
+
+
+class TestCustomerImport:
+    def test_import(self, importer):
+        """Test importing a CSV whose columns match the table with a single COPY"""
+        assert importer.import_customer_data(CUSTOMER_CSV)
+
+        assert query(importer, SELECT_ROWS) == read_rows(CUSTOMER_CSV)
+
+    def test_import_reordered_columns(self, importer, tmp_path):
+        """Test importing a CSV with columns in another order, in several batches"""
+        path = tmp_path / "reversed.csv"
+        rows = read_rows(CUSTOMER_CSV)
+        write_csv(path, list(CSV_HEADER_COLUMNS)[::-1], rows)
+
+        assert importer.import_customer_data(str(path), batch_size=70)
+
+        assert query(importer, SELECT_ROWS) == rows
+
+    def test_failed_import_truncates(self, importer, tmp_path):
+        """Test that a bad row after committed batches leaves the table empty"""
+        path = tmp_path / "bad_date.csv"
+        rows = read_rows(CUSTOMER_CSV)
+        rows[600] = rows[600][:10] + ("not a date",) + rows[600][11:]
+        write_csv(path, list(CSV_HEADER_COLUMNS)[::-1], rows)
+
+        assert not importer.import_customer_data(str(path), batch_size=70)
+
+        assert query(importer, "SELECT COUNT(*) FROM customers") == [(0,)]
+
+    def test_skip_populated_table(self, importer):
+        """Test that a populated table is left as is, but switched to LOGGED"""
+        assert importer.import_customer_data(CUSTOMER_CSV)
+        importer.connect()
+        importer.execute_query("ALTER TABLE customers SET UNLOGGED", commit=True)
+        importer.disconnect()
+
+        assert importer.import_customer_data(CUSTOMER_CSV)
+        assert importer.import_customer_data_parallel(CUSTOMER_CSV, workers=4)
+
+        assert query(importer, "SELECT COUNT(*) FROM customers") == [(1000,)]
+        assert query(
+            importer, "SELECT relpersistence FROM pg_class WHERE oid = 'customers'::regclass"
+        ) == [("p",)]
+
+    @pytest.mark.parametrize("workers", [4, 9])
+    def test_import_parallel(self, importer, workers):
+        """Test that the shards of a parallel import load every row exactly once"""
+        assert importer.import_customer_data_parallel(CUSTOMER_CSV, workers=workers)
+
+        assert query(importer, SELECT_ROWS) == read_rows(CUSTOMER_CSV)
+
+    def test_failed_parallel_import_truncates(self, importer, tmp_path):
+        """Test that a failing shard leaves the table empty"""
+        path = tmp_path / "bad_date.csv"
+        rows = read_rows(CUSTOMER_CSV)
+        rows[600] = rows[600][:10] + ("not a date",) + rows[600][11:]
+        write_csv(path, list(CSV_HEADER_COLUMNS), rows)
+
+        assert not importer.import_customer_data_parallel(str(path), workers=4)
+
+        assert query(importer, "SELECT COUNT(*) FROM customers") == [(0,)]
@@ -0,0 +1,89 @@
+import csv
+import io
+import pytest
+from src.core.database import _CopyIter, _csv_lines, _shard_lines
+
+CUSTOMER_CSV = "data/customer.csv"
+
+
+def read_shards(path, workers):
+    """Read every shard of a file the way the parallel import splits it"""
+    with open(path, "rb") as f:
+        size = f.seek(0, io.SEEK_END)
+        bounds = [size * i // workers for i in range(workers + 1)]
+        return [list(_shard_lines(f, bounds[i], bounds[i + 1])) for i in range(workers)]
+
+
+class TestShardLines:
+    @pytest.mark.parametrize("workers", [1, 2, 3, 4, 7, 16, 100, 5000])
+    def test_shards_cover_body_once(self, workers):
+        """Test that shards concatenate to the file body without duplicate or missing lines"""
+        with open(CUSTOMER_CSV, "rb") as f:
+            body = f.readlines()[1:]
+
+        shards = read_shards(CUSTOMER_CSV, workers)
+
+        assert len(shards) == workers
+        assert [line for shard in shards for line in shard] == body
+
+    @pytest.mark.parametrize("workers", [1, 2, 5, 20, 64])
+    def test_header_longer_than_shard(self, tmp_path, workers):
+        """Test that only the first shard skips the header, even when it spans several shards"""
+        path = tmp_path / "customers.csv"
+        header = b"a-very-long-header-line-that-spans-many-shards," * 4 + b"end\n"
+        body = [b"1,x\n", b"2,y\n", b"3,z\n"]
+        path.write_bytes(header + b"".join(body))
+
+        shards = read_shards(path, workers)
+
+        assert [line for shard in shards for line in shard] == body
+
+    def test_missing_trailing_newline(self, tmp_path):
+        """Test that a last line without a newline is still read exactly once"""
+        path = tmp_path / "customers.csv"
+        path.write_bytes(b"h\n1\n2\n3")
+
+        shards = read_shards(path, 3)
+
+        assert [line for shard in shards for line in shard] == [b"1\n", b"2\n", b"3"]
+
+
+class TestCopyIter:
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 8192])
+    def test_read_reassembles_chunks(self, size):
+        """Test that reading in fixed sizes returns the chunks joined in order"""
+        chunks = [b"abc", b"", b"defgh", b"i", b"jklmnopqrstuvwxyz"]
+        stream = _CopyIter(iter(chunks))
+
+        data = b""
+        while True:
+            block = stream.read(size)
+            assert len(block) <= size
+            if not block:
+                break
+            data += block
+
+        assert data == b"".join(chunks)
+
+    def test_read_all(self):
+        """Test that read() without a size drains every chunk"""
+        assert _CopyIter(iter([b"a", b"bc", b"def"])).read() == b"abcdef"
+
+    def test_empty_iterator(self):
+        """Test that an empty iterator reads as end of file"""
+        assert _CopyIter(iter([])).read(10) == b""
+
+
+class TestCsvLines:
+    def test_round_trip(self):
+        """Test that encoded lines parse back to the original rows"""
+        rows = [
+            ("1", "Terry, Proctor and Lawrence", 'say "hi"'),
+            ("2", "Zoë", ""),
+        ]
+
+        lines = list(_csv_lines(rows))
+
+        assert len(lines) == len(rows)
+        assert all(line.endswith(b"\n") for line in lines)
+        assert [tuple(row) for row in csv.reader(io.StringIO(b"".join(lines).decode("utf-8")))] == rows